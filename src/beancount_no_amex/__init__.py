@@ -1,31 +1,87 @@
-# Classification components (re-exported from beancount-classifier)
-from beancount_classifier import (
-    # Core classes (advanced usage)
-    AccountSplit,
-    AmountCondition,
-    AmountOperator,
-    ClassificationResult,
-    ClassifierMixin,
-    SharedExpense,
-    TransactionClassifier,
-    TransactionPattern,
-    amount,  # amount < 50, amount > 100, amount.between(50, 100)
-    field,  # field(to_account="12345") >> "Assets:Savings"
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # Classification components (re-exported from beancount-classifier)
+    from beancount_classifier import (
+        # Core classes (advanced usage)
+        AccountSplit,
+        AmountCondition,
+        AmountOperator,
+        ClassificationResult,
+        ClassifierMixin,
+        SharedExpense,
+        TransactionClassifier,
+        TransactionPattern,
+        amount,  # amount < 50, amount > 100, amount.between(50, 100)
+        field,  # field(to_account="12345") >> "Assets:Savings"
+        # Fluent API - "Classification for Humans"
+        match,  # match("SPOTIFY") >> "Expenses:Music"
+        shared,  # ... | shared("Assets:Receivables:Alex", 50)
+        when,  # when(amount < 50) >> "Expenses:PettyCash"
+    )
+
+    from .importer import AmexAccountConfig, AmexConfig, Config, Importer
+
+    # OFX-specific data models
+    from .models import (
+        BeanTransaction,
+        ParsedTransaction,
+        QboFileData,
+        RawTransaction,
+    )
+
+# Public names are resolved on first access (PEP 562), so importing the
+# package for a single name only loads the module that defines it.
+_LAZY_IMPORTS = {
+    # Main importer classes
+    "AmexAccountConfig": ".importer",
+    "AmexConfig": ".importer",
+    "Config": ".importer",
+    "Importer": ".importer",
     # Fluent API - "Classification for Humans"
-    match,  # match("SPOTIFY") >> "Expenses:Music"
-    shared,  # ... | shared("Assets:Receivables:Alex", 50)
-    when,  # when(amount < 50) >> "Expenses:PettyCash"
-)
-
-from .importer import AmexAccountConfig, AmexConfig, Config, Importer  # noqa: F401
-
-# OFX-specific data models
-from .models import (
-    BeanTransaction,
-    ParsedTransaction,
-    QboFileData,
-    RawTransaction,
-)
+    "match": "beancount_classifier",  # match("SPOTIFY") >> "Expenses:Music"
+    "when": "beancount_classifier",  # when(amount < 50) >> "Expenses:PettyCash"
+    "field": "beancount_classifier",  # field(to_account="12345") >> "Assets:Savings"
+    "shared": "beancount_classifier",  # ... | shared("Assets:Receivables:Alex", 50)
+    "amount": "beancount_classifier",  # amount < 50, amount.between(50, 100)
+    # Classification (advanced usage)
+    "AccountSplit": "beancount_classifier",
+    "AmountCondition": "beancount_classifier",
+    "AmountOperator": "beancount_classifier",
+    "ClassificationResult": "beancount_classifier",
+    "ClassifierMixin": "beancount_classifier",
+    "SharedExpense": "beancount_classifier",
+    "TransactionClassifier": "beancount_classifier",
+    "TransactionPattern": "beancount_classifier",
+    # OFX data models
+    "BeanTransaction": ".models",
+    "ParsedTransaction": ".models",
+    "QboFileData": ".models",
+    "RawTransaction": ".models",
+}
+
+# Submodules that an eager package import used to make available as
+# attributes (beancount_no_amex.credit etc.); they are loaded on access.
+_LAZY_SUBMODULES = ("credit", "importer", "models")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_SUBMODULES:
+        # import_module also binds the submodule on the package
+        return importlib.import_module(f".{name}", __name__)
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the module so later lookups bypass __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__) | set(_LAZY_SUBMODULES))
+
 
 __all__ = [
     # Main importer classes
@@ -1,9 +1,13 @@
 import datetime
+import functools
 import logging
+import os
+import re
+import threading
 import warnings
+from collections.abc import Iterable
 from dataclasses import dataclass, field
-from decimal import Decimal
-from pathlib import Path
+from decimal import Decimal, InvalidOperation
 
 import beangulp
 from beancount.core import data
@@ -18,7 +22,6 @@ from lxml import etree
 from pydantic import ValidationError
 
 from beancount_no_amex.models import (
-    ParsedTransaction,
     QboFileData,
     RawTransaction,
 )
@@ -35,6 +38,28 @@ LEGACY_PROVIDER_ID_META_KEY = "id"
 OFX_DATE_FORMAT = "%Y%m%d"
 OFX_DATETIME_FORMAT = "%Y%m%d%H%M%S"
 OFX_STATEMENT_TYPES = ("STMTRS", "CCSTMTRS", "INVSTMTRS")
+# OFX header or statement aggregate, sniffed in one scan by identify(). The
+# markers are ASCII, so the patterns match the raw bytes without decoding.
+OFX_MARKER_PATTERN = re.compile(
+    "|".join(("OFXHEADER", "<OFX", *OFX_STATEMENT_TYPES)).encode("ascii")
+)
+# ACCTID of the statement's source account, matched in the raw file head so
+# identify() and find_account_id() can skip parsing the document. The match
+# may not run past the end of its own ACCTFROM block, and the value must be
+# followed by a tag so one cut off at the end of the head is not accepted.
+OFX_ACCTID_PATTERN = re.compile(
+    rb"<(?:CC|BANK)ACCTFROM>(?:(?!ACCTFROM>).)*?<ACCTID>([^<]*)(?=<)", re.DOTALL
+)
+# XML comments, removed from the head before looking for the ACCTID. An
+# unterminated one runs to the end of the head.
+OFX_COMMENT_PATTERN = re.compile(rb"<!--.*?(?:-->|\Z)", re.DOTALL)
+# identify() sniffs a small head first; the OFX markers and ACCTID sit in
+# the first couple of KB of real exports. It only reads up to the larger
+# limit when the small head is inconclusive.
+IDENTIFY_HEAD_BYTES = 4096
+IDENTIFY_MAX_HEAD_BYTES = 65536
+# Elements _parse_qbo_file reacts to while streaming a statement.
+OFX_PARSE_TAGS = ("STMTTRN", "LEDGERBAL", "CCACCTFROM", "BANKACCTFROM", "FI", "CURDEF")
 # Descriptions of settlement payments on Norwegian Amex statements. Unlike
 # DNB, Amex has no single canonical payment description, so this is a
 # (configurable) list of case-insensitive substrings. "AUTOGIROBETALING" is
@@ -164,35 +189,129 @@ class AmexAccountConfig(Config):
         )
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_ofx_time(date_str: str) -> datetime.datetime:
     """Parse an OFX time string and return a datetime object.
 
+    Results are cached: a statement typically repeats the same handful of
+    DTPOSTED values, and date() and extract() both parse them.
+
     Args:
         date_str: A string, the date to be parsed in YYYYMMDD or YYYYMMDDHHMMSS format.
     Returns:
         A datetime.datetime instance.
     """
     if len(date_str) < 14:
-        return datetime.datetime.strptime(date_str[:8], OFX_DATE_FORMAT)
-    return datetime.datetime.strptime(date_str[:14], OFX_DATETIME_FORMAT)
+        day = date_str[:8]
+        if len(day) == 8 and day.isascii() and day.isdigit():
+            return datetime.datetime(int(day[:4]), int(day[4:6]), int(day[6:]))
+        return datetime.datetime.strptime(day, OFX_DATE_FORMAT)
+    stamp = date_str[:14]
+    if stamp.isascii() and stamp.isdigit():
+        return datetime.datetime(
+            int(stamp[:4]),
+            int(stamp[4:6]),
+            int(stamp[6:8]),
+            int(stamp[8:10]),
+            int(stamp[10:12]),
+            int(stamp[12:]),
+        )
+    return datetime.datetime.strptime(stamp, OFX_DATETIME_FORMAT)
+
+
+@functools.lru_cache(maxsize=2048)
+def parse_ofx_amount(amount_str: str) -> Decimal:
+    """Parse an OFX amount string (TRNAMT, BALAMT) into a Decimal.
+
+    Results are cached: statements repeat amounts (subscriptions, fees,
+    round purchases) and Decimal instances are immutable, so they can be
+    shared between transactions.
+
+    Args:
+        amount_str: The amount as it appears in the file, e.g. '-742.18'.
+    Returns:
+        A Decimal instance.
+    Raises:
+        ValueError: If the string is not a valid number.
+    """
+    # Plain amounts like '-742.18' go straight to Decimal; D() is only
+    # needed to strip thousands separators and to raise ValueError.
+    try:
+        return Decimal(amount_str)
+    except InvalidOperation:
+        return D(amount_str)
+
+
+_parser_local = threading.local()
+
+
+def _get_recovering_parser() -> etree.XMLParser:
+    """Return this thread's reusable recovering XML parser.
+
+    lxml parsers can be reused for any number of documents, but not shared
+    between threads, so one is kept per thread.
+    """
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        parser = _parser_local.parser = etree.XMLParser(recover=True)
+    return parser
+
+
+def _account_id_from_head(head: bytes, complete: bool) -> str | None:
+    """Read the ACCTID from raw file bytes the way the XML parsers pick it.
+
+    The first CCACCTFROM block decides. A BANKACCTFROM is only used when the
+    head holds the whole file (complete), as a CCACCTFROM further on would
+    take precedence over it. Returns None whenever the head is inconclusive
+    so callers fall back to the parser: no usable block, an empty ACCTID,
+    or a value with entity references for the parser to decode. ACCTIDs
+    inside comments are ignored.
+    """
+    if b"<!--" in head:
+        head = OFX_COMMENT_PATTERN.sub(b"", head)
+    start = head.find(b"<CCACCTFROM>")
+    if start < 0:
+        if not complete:
+            return None
+        start = head.find(b"<BANKACCTFROM>")
+        if start < 0:
+            return None
+    match = OFX_ACCTID_PATTERN.match(head, start)
+    if match is None or b"&" in match.group(1):
+        return None
+    return match.group(1).decode("utf-8", errors="ignore").strip() or None
 
 
 def find_account_id(filepath: str) -> str | None:
     """Quickly extract the account ID from a QBO file without full parsing.
 
+    The file head is scanned first; the document is only parsed when the
+    ACCTID is not found there.
+
     Args:
         filepath: Path to the QBO file
     Returns:
         The account ID string, or None if not found
     """
     try:
-        parser = etree.XMLParser(recover=True)
         with open(filepath, "rb") as f:
-            tree = etree.parse(f, parser)
-
-        acct_from = tree.find(".//CCACCTFROM")
-        if acct_from is None:
-            acct_from = tree.find(".//BANKACCTFROM")
+            head = f.read(IDENTIFY_HEAD_BYTES)
+            account_id = _account_id_from_head(
+                head, complete=len(head) < IDENTIFY_HEAD_BYTES
+            )
+            if account_id:
+                return account_id
+            f.seek(0)
+            tree = etree.parse(f, _get_recovering_parser())
+
+        # One walk for both account blocks; CCACCTFROM takes precedence
+        acct_from = None
+        for elem in tree.iter("CCACCTFROM", "BANKACCTFROM"):
+            if elem.tag == "CCACCTFROM":
+                acct_from = elem
+                break
+            if acct_from is None:
+                acct_from = elem
         if acct_from is not None:
             acct_id = acct_from.findtext("ACCTID")
             if acct_id:
@@ -202,6 +321,36 @@ def find_account_id(filepath: str) -> str | None:
     return None
 
 
+def _read_curdef(element: etree._Element) -> tuple[str, bool] | None:
+    """Return a CURDEF's currency and whether it sits in a statement section."""
+    text = (element.text or "").strip()
+    if not text:
+        return None
+    parent = element.getparent()
+    in_statement = parent is not None and any(
+        stmt_type in parent.tag for stmt_type in OFX_STATEMENT_TYPES
+    )
+    return text, in_statement
+
+
+def _select_currency(curdefs: Iterable[tuple[str, bool] | None]) -> str | None:
+    """Pick the file currency from CURDEFs read in document order.
+
+    The first CURDEF inside a statement response section wins; otherwise
+    the first non-empty CURDEF anywhere in the document is used.
+    """
+    fallback = None
+    for curdef in curdefs:
+        if curdef is None:
+            continue
+        text, in_statement = curdef
+        if in_statement:
+            return text
+        if fallback is None:
+            fallback = text
+    return fallback
+
+
 def find_currency(tree) -> str | None:
     """Find the currency specified in the OFX file.
 
@@ -210,17 +359,7 @@ def find_currency(tree) -> str | None:
     Returns:
         A string with the currency code, or None if not found
     """
-    # Look for CURDEF tags in statement response sections
-    for stmt_type in OFX_STATEMENT_TYPES:
-        for elem in tree.xpath(f".//*[contains(local-name(), '{stmt_type}')]/CURDEF"):
-            if text := (elem.text or "").strip():
-                return text
-
-    # Fallback: find any CURDEF tag in the document
-    return next(
-        (elem.text.strip() for elem in tree.xpath(".//CURDEF") if elem.text and elem.text.strip()),
-        None,
-    )
+    return _select_currency(_read_curdef(elem) for elem in tree.iter("CURDEF"))
 
 
 class Importer(ClassifierMixin, beangulp.Importer):
@@ -247,6 +386,8 @@ class Importer(ClassifierMixin, beangulp.Importer):
 
         # Store configuration values from the config object
         self.account_name = config.account_name
+        # Leaf component used in archive filenames (e.g. 'Personal')
+        self._account_leaf = config.account_name.rsplit(":", 1)[-1]
         self.currency = config.currency  # Store configured currency
         self.account_id = config.account_id  # Optional account ID for matching
         self.transaction_patterns = config.transaction_patterns
@@ -263,6 +404,12 @@ class Importer(ClassifierMixin, beangulp.Importer):
         self.payment_patterns = tuple(
             pattern.upper() for pattern in config.payment_patterns
         )
+        # All payment patterns as one alternation, matched in a single scan
+        self._payment_pattern = (
+            re.compile("|".join(map(re.escape, self.payment_patterns)))
+            if self.payment_patterns
+            else None
+        )
         self.skip_deduplication = config.skip_deduplication
         self.generate_balance_assertions = config.generate_balance_assertions
         self.flag = flag
@@ -271,44 +418,156 @@ class Importer(ClassifierMixin, beangulp.Importer):
         if debug:
             self.logger.setLevel(logging.DEBUG)
         self.dedup_window = datetime.timedelta(days=3)
+        # Most recent parse as (path, (mtime_ns, size), data); see _parse_qbo_file
+        self._last_parse: tuple[str, tuple[int, int], QboFileData] | None = None
+        # (ledger list, its length, FITIDs); see _extract_existing_fitids
+        self._existing_fitids_cache: (
+            tuple[list[data.Directive], int, frozenset[str]] | None
+        ) = None
 
     def _parse_qbo_file(self, filepath: str) -> QboFileData:
-        """Parse the QBO file and extract transactions and balance info using lxml."""
+        """Return the parsed QBO file, reusing the previous parse if unchanged.
+
+        Only the most recent parse is kept, together with the path,
+        modification time and size it was read at. Back-to-back calls for
+        the same file share one parse, while a run over many files never
+        holds more than one statement. A rewrite that keeps both the size
+        and the mtime (possible within one tick of a coarse filesystem
+        clock) is not noticed. The cached QboFileData is shared between
+        callers and must not be mutated.
+        """
+        version = self._file_version(filepath)
+        if version is None:
+            return self._read_qbo_file(filepath)
+        cached = self._cached_qbo_file(filepath, version)
+        if cached is not None:
+            return cached
+        result = self._read_qbo_file(filepath)
+        self._last_parse = (filepath, version, result)
+        return result
+
+    def _cached_qbo_file(
+        self, filepath: str, version: tuple[int, int] | None = None
+    ) -> QboFileData | None:
+        """Return the last parse if it is of the file's current version."""
+        if self._last_parse is None:
+            return None
+        path, cached_version, result = self._last_parse
+        if path != filepath:
+            return None
+        if version is None:
+            version = self._file_version(filepath)
+        return result if cached_version == version else None
+
+    @staticmethod
+    def _file_version(filepath: str) -> tuple[int, int] | None:
+        """Return the (mtime_ns, size) the parse cache is validated against."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_qbo_file(self, filepath: str) -> QboFileData:
+        """Parse the QBO file and extract transactions and balance info using lxml.
+
+        The file is streamed with iterparse in a single pass. Each <STMTTRN>
+        is read and cleared as soon as it is complete, so the statement DOM
+        is never held in memory as a whole.
+
+        Recovery nests a <STMTTRN> that is missing its close tag around the
+        following one, which then ends first. Rows are therefore slotted in
+        by start tag to keep document order, and an outer transaction's
+        fields are never pruned as siblings of the nested one.
+        """
         result = QboFileData()
+        # One slot per STMTTRN in document order, filled when it ends
+        rows: list[RawTransaction | None] = []
+        open_rows: list[int] = []
+        # Text of the first occurrence of each metadata element. Only strings
+        # are kept, so no element pins the document once streaming ends.
+        account_ids: dict[str, str | None] = {}
+        organization = None
+        ledger_balance: tuple[str | None, str | None] | None = None
+        curdefs: list[tuple[str, bool] | None] = []
         try:
-            # Parse the file with recovery mode for potentially malformed XML
-            parser = etree.XMLParser(recover=True)
+            # Stream the file with recovery mode for potentially malformed XML
             with open(filepath, "rb") as f:
-                tree = etree.parse(f, parser)
+                for event, element in etree.iterparse(
+                    f, events=("start", "end"), tag=OFX_PARSE_TAGS, recover=True
+                ):
+                    tag = element.tag
+                    if event == "start":
+                        if tag == "STMTTRN":
+                            open_rows.append(len(rows))
+                            rows.append(None)
+                        continue
+                    if tag == "STMTTRN":
+                        # Extract key fields
+                        dtposted = element.findtext("DTPOSTED")
+                        trnamt = element.findtext("TRNAMT")
+                        name = element.findtext("NAME")
+                        memo = element.findtext("MEMO")
+                        fitid = element.findtext("FITID")
+                        trntype = element.findtext("TRNTYPE")
+
+                        # Create raw transaction. findtext() already yields
+                        # str | None, so pydantic validation is skipped.
+                        raw_txn = RawTransaction.model_construct(
+                            date=dtposted,
+                            amount=trnamt or "0.00",
+                            payee=name.strip() if name else None,
+                            memo=(memo or "").strip(),
+                            id=fitid,
+                            type=trntype,
+                        )
+                        rows[open_rows.pop()] = raw_txn
+
+                        # Free the element and the already-processed siblings,
+                        # unless those are the fields of an enclosing STMTTRN
+                        element.clear()
+                        parent = element.getparent()
+                        if parent is not None and parent.tag != "STMTTRN":
+                            while element.getprevious() is not None:
+                                del parent[0]
+                    elif tag == "CURDEF":
+                        curdefs.append(_read_curdef(element))
+                    elif tag == "FI":
+                        if organization is None:
+                            organization = element.findtext("ORG") or ""
+                    elif tag == "LEDGERBAL":
+                        if ledger_balance is None:
+                            ledger_balance = (
+                                element.findtext("BALAMT"),
+                                element.findtext("DTASOF"),
+                            )
+                    else:
+                        account_ids.setdefault(tag, element.findtext("ACCTID"))
+
+            result.transactions = [row for row in rows if row is not None]
 
             # Extract account ID from CCACCTFROM or BANKACCTFROM
-            acct_from = tree.find(".//CCACCTFROM")
-            if acct_from is None:
-                acct_from = tree.find(".//BANKACCTFROM")
-            if acct_from is not None:
-                acct_id = acct_from.findtext("ACCTID")
-                if acct_id:
-                    result.account_id = acct_id.strip()
+            if "CCACCTFROM" in account_ids:
+                acct_id = account_ids["CCACCTFROM"]
+            else:
+                acct_id = account_ids.get("BANKACCTFROM")
+            if acct_id:
+                result.account_id = acct_id.strip()
 
             # Extract organization info (e.g., "AMEX")
-            fi_elem = tree.find(".//FI")
-            if fi_elem is not None:
-                org = fi_elem.findtext("ORG")
-                if org:
-                    result.organization = org.strip()
+            if organization:
+                result.organization = organization.strip()
 
             # Extract currency information
-            result.currency = find_currency(tree)
+            result.currency = _select_currency(curdefs)
 
             # Extract balance information
-            ledger_bal = tree.find(".//LEDGERBAL")
-            if ledger_bal is not None:
-                bal_amt = ledger_bal.findtext("BALAMT")
+            if ledger_balance is not None:
+                bal_amt, dtasof = ledger_balance
                 if bal_amt:
                     result.balance = bal_amt
 
                     # Try to get the balance date if available
-                    dtasof = ledger_bal.findtext("DTASOF")
                     if dtasof:
                         try:
                             # Use the parse_ofx_time function
@@ -316,30 +575,6 @@ class Importer(ClassifierMixin, beangulp.Importer):
                         except ValueError:
                             pass
 
-            # Find all <STMTTRN> elements
-            stmttrn_elements = tree.findall(".//STMTTRN")
-
-            for idx, element in enumerate(stmttrn_elements, 1):
-                # Extract key fields
-                dtposted = element.findtext("DTPOSTED")
-                trnamt = element.findtext("TRNAMT")
-                name = element.findtext("NAME")
-                memo = element.findtext("MEMO")
-                fitid = element.findtext("FITID")
-                trntype = element.findtext("TRNTYPE")
-
-                # Create raw transaction
-                raw_txn = RawTransaction(
-                    date=dtposted,
-                    amount=trnamt or "0.00",
-                    payee=name.strip() if name else None,
-                    memo=(memo or "").strip(),
-                    id=fitid,
-                    type=trntype,
-                )
-                
-                result.transactions.append(raw_txn)
-
             return result
 
         except etree.XMLSyntaxError as e:
@@ -371,27 +606,41 @@ class Importer(ClassifierMixin, beangulp.Importer):
         # Default currency should never be None, but use DEFAULT_CURRENCY as fallback
         return self.currency or DEFAULT_CURRENCY
 
-    def _extract_existing_fitids(self, existing_entries: list[data.Directive]) -> set[str]:
+    def _extract_existing_fitids(
+        self, existing_entries: list[data.Directive]
+    ) -> frozenset[str]:
         """Extract all FITIDs from existing entries for deduplication.
 
         Scans the existing ledger entries for transactions that carry the
         FITID under 'provider_transaction_id' (or the legacy 'id' key) and
         returns them as a set for efficient lookup during import.
 
+        beangulp hands the same ledger list to every file of an import run,
+        so the result for the most recent list is kept and reused as long as
+        its length is unchanged.
+
         Args:
             existing_entries: List of existing Beancount directives from the ledger.
 
         Returns:
             Set of FITID strings found in existing transactions.
         """
-        existing_fitids: set[str] = set()
-        for entry in existing_entries:
-            if isinstance(entry, data.Transaction):
-                fitid = entry.meta.get(PROVIDER_ID_META_KEY) or entry.meta.get(
-                    LEGACY_PROVIDER_ID_META_KEY
-                )
-                if fitid:
-                    existing_fitids.add(fitid)
+        cached = self._existing_fitids_cache
+        if (
+            cached is not None
+            and cached[0] is existing_entries
+            and cached[1] == len(existing_entries)
+        ):
+            return cached[2]
+
+        existing_fitids = frozenset(
+            fitid for entry in existing_entries if (fitid := self._get_fitid(entry))
+        )
+        self._existing_fitids_cache = (
+            existing_entries,
+            len(existing_entries),
+            existing_fitids,
+        )
         return existing_fitids
 
     def _get_fitid(self, entry: data.Directive) -> str | None:
@@ -413,7 +662,15 @@ class Importer(ClassifierMixin, beangulp.Importer):
         """Mark duplicates by exact FITID instead of Beangulp's fuzzy default."""
         if self.skip_deduplication:
             return
-        extract.mark_duplicate_entries(entries, existing, self.dedup_window, self._same_fitid)
+        # Only entries whose FITID is already in the ledger can be duplicates
+        existing_fitids = self._extract_existing_fitids(existing)
+        candidates = [
+            entry for entry in entries if self._get_fitid(entry) in existing_fitids
+        ]
+        if candidates:
+            extract.mark_duplicate_entries(
+                candidates, existing, self.dedup_window, self._same_fitid
+            )
 
     def identify(self, filepath: str) -> bool:
         """Check if the file is an American Express QBO statement.
@@ -426,28 +683,40 @@ class Importer(ClassifierMixin, beangulp.Importer):
         When account_id is configured, also verifies that the file's ACCTID matches.
         This enables multiple importers to handle different Amex accounts.
         """
-        if Path(filepath).suffix.lower() != ".qbo":
+        if not filepath.lower().endswith(".qbo"):
             return False
 
         # Content-based check for OFX/QBO structure
         try:
             with open(filepath, "rb") as f:
-                head = f.read(65536)
+                head = f.read(IDENTIFY_HEAD_BYTES)
+                head_limit = IDENTIFY_HEAD_BYTES
+                # Only a CCACCTFROM settles the ACCTID; a BANKACCTFROM may
+                # still be overridden by one further on
+                if not OFX_MARKER_PATTERN.search(head) or (
+                    self.account_id is not None and b"<CCACCTFROM>" not in head
+                ):
+                    head += f.read(IDENTIFY_MAX_HEAD_BYTES - len(head))
+                    head_limit = IDENTIFY_MAX_HEAD_BYTES
         except OSError:
             return False
-        head_text = head.decode("utf-8", errors="ignore")
-        has_ofx_header = "OFXHEADER" in head_text or "<OFX" in head_text
-        has_statement = any(stmt in head_text for stmt in OFX_STATEMENT_TYPES)
-        if not (has_ofx_header or has_statement):
+        if not OFX_MARKER_PATTERN.search(head):
             return False
 
         # If no account_id configured, match any Amex QBO file
         if self.account_id is None:
             return True
 
-        # Match specific account ID
-        file_account_id = find_account_id(filepath)
-        return file_account_id == self.account_id
+        # Match specific account ID, read from the head when it is there and
+        # falling back to an already parsed copy or a full parse for
+        # unusually long headers
+        file_account_id = _account_id_from_head(head, complete=len(head) < head_limit)
+        if file_account_id:
+            return file_account_id == self.account_id
+        cached = self._cached_qbo_file(filepath)
+        if cached is not None:
+            return cached.account_id == self.account_id
+        return find_account_id(filepath) == self.account_id
 
     def account(self, filepath: str) -> str:
         """Return the account name for the file."""
@@ -455,36 +724,24 @@ class Importer(ClassifierMixin, beangulp.Importer):
 
     def filename(self, filepath: str) -> str:
         """Generate a provider/account/original filename for archived data."""
-        base_name = Path(filepath).name
-        account_leaf = self.account_name.split(":")[-1]
-        return f"amex.{account_leaf}.{base_name}"
+        base_name = os.path.basename(filepath)
+        return f"amex.{self._account_leaf}.{base_name}"
 
     def date(self, filepath: str) -> datetime.date | None:
         """Extract the latest transaction date from the file."""
         parsed_data = self._parse_qbo_file(filepath)
 
-        # Convert raw transactions to parsed transactions
-        parsed_transactions = []
+        # Only the dates are needed; unparseable ones are ignored
+        latest_date = None
         for raw_txn in parsed_data.transactions:
+            if not raw_txn.date:
+                continue
             try:
-                if raw_txn.date:
-                    date_val = parse_ofx_time(raw_txn.date).date()
-                    parsed_txn = ParsedTransaction(
-                        date=date_val,
-                        amount=Decimal(raw_txn.amount or "0.00"),
-                        payee=raw_txn.payee,
-                        memo=raw_txn.memo,
-                        id=raw_txn.id,
-                        type=raw_txn.type,
-                    )
-                    parsed_transactions.append(parsed_txn)
-            except (ValueError, ValidationError):
+                txn_date = parse_ofx_time(raw_txn.date).date()
+            except ValueError:
                 continue
-
-        if not parsed_transactions:
-            return None
-
-        latest_date = max(t.date for t in parsed_transactions)
+            if latest_date is None or txn_date > latest_date:
+                latest_date = txn_date
         return latest_date
 
     # finalize() is inherited from ClassifierMixin
@@ -527,6 +784,15 @@ class Importer(ClassifierMixin, beangulp.Importer):
         # 2. Determine the currency to use
         currency = self._determine_currency(qbo_data.currency)
 
+        # Bind per-row constructors and settings to locals for the loop below
+        Posting = data.Posting
+        Transaction = data.Transaction
+        empty_set = data.EMPTY_SET
+        account_name = self.account_name
+        flag = self.flag
+        finalize = self.finalize
+        payment_pattern = self._payment_pattern if self.skip_payments else None
+
         # 4. Process each raw transaction
         for idx, raw_txn in enumerate(qbo_data.transactions, 1):
             try:
@@ -547,9 +813,8 @@ class Importer(ClassifierMixin, beangulp.Importer):
                 txn_type = raw_txn.type
 
                 # Skip settlement payment entries if configured
-                description = (payee or memo or "").upper()
-                if self.skip_payments and any(
-                    pattern in description for pattern in self.payment_patterns
+                if payment_pattern is not None and payment_pattern.search(
+                    (payee or memo or "").upper()
                 ):
                     self.logger.debug(
                         "Skipping payment entry %s (%s)",
@@ -560,7 +825,8 @@ class Importer(ClassifierMixin, beangulp.Importer):
 
                 # Use payee as narration, fallback to memo if payee is missing
                 narration = payee or memo
-                metadata = data.new_metadata(filepath, idx) # Start with standard metadata
+                # Standard metadata, as data.new_metadata() would build it
+                metadata = {"filename": filepath, "lineno": idx}
 
                 # Add specific metadata if available
                 if txn_id:
@@ -574,7 +840,7 @@ class Importer(ClassifierMixin, beangulp.Importer):
                 # 3c. Create the primary posting for the credit card account
                 try:
                     # Convert amount string to Decimal
-                    amount_decimal = D(amount_str)
+                    amount_decimal = parse_ofx_amount(amount_str)
                 except Exception as e:
                     self.logger.warning(
                         "Skipping transaction %s in %s due to invalid amount %r: %s",
@@ -586,24 +852,22 @@ class Importer(ClassifierMixin, beangulp.Importer):
                     continue
 
                 amount_obj = Amount(amount_decimal, currency)
-                primary_posting = data.Posting(
-                    self.account_name, amount_obj, None, None, None, None
-                )
+                primary_posting = Posting(account_name, amount_obj, None, None, None, None)
 
                 # 3d. Create the initial Beancount transaction (without balancing posting yet)
-                txn = data.Transaction(
+                txn = Transaction(
                     meta=metadata,
                     date=txn_date,
-                    flag=self.flag,
+                    flag=flag,
                     payee=payee, # Keep original payee (can be None)
                     narration=narration,
-                    tags=data.EMPTY_SET, # Initialize tags/links
-                    links=data.EMPTY_SET,
+                    tags=empty_set, # Initialize tags/links
+                    links=empty_set,
                     postings=[primary_posting],
                 )
 
                 # 3e. Apply finalization logic (adds balancing posting)
-                finalized_txn = self.finalize(txn, raw_txn) # Pass raw_txn for context
+                finalized_txn = finalize(txn, raw_txn) # Pass raw_txn for context
 
                 # Skip if finalization failed or indicated skipping
                 if finalized_txn is None:
@@ -637,7 +901,7 @@ class Importer(ClassifierMixin, beangulp.Importer):
         # 4. Add balance assertion if enabled and available
         if self.generate_balance_assertions and qbo_data.balance is not None and qbo_data.balance_date:
             try:
-                balance_decimal = D(qbo_data.balance)
+                balance_decimal = parse_ofx_amount(qbo_data.balance)
                 # QBO balance is typically the balance *at the end* of the statement date.
                 # Beancount balance assertion applies at the *start* of the day.
                 # So, we assert the balance for the day *after* the statement balance date.
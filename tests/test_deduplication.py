@@ -227,6 +227,31 @@ class TestExtractExistingFitids:
 
         assert fitids == set()
 
+    def test_reuses_result_for_same_ledger(self, importer_with_deduplication):
+        """The same unchanged ledger list is only scanned once."""
+        existing = [
+            create_existing_transaction("FITID001", datetime.date(2025, 3, 1), D("-100")),
+        ]
+
+        first = importer_with_deduplication._extract_existing_fitids(existing)
+        second = importer_with_deduplication._extract_existing_fitids(existing)
+
+        assert second is first
+
+    def test_rescans_after_ledger_grows(self, importer_with_deduplication):
+        """Entries appended to the ledger list are picked up."""
+        existing = [
+            create_existing_transaction("FITID001", datetime.date(2025, 3, 1), D("-100")),
+        ]
+        importer_with_deduplication._extract_existing_fitids(existing)
+        existing.append(
+            create_existing_transaction("FITID002", datetime.date(2025, 3, 2), D("-200"))
+        )
+
+        fitids = importer_with_deduplication._extract_existing_fitids(existing)
+
+        assert fitids == {"FITID001", "FITID002"}
+
 
 # =============================================================================
 # Tests for deduplication in extract()
@@ -320,6 +320,18 @@ class TestDateMethod:
         result = basic_importer.date(str(empty_file))
         assert result is None
 
+    def test_ignores_unparseable_dates(self, basic_importer, tmp_path):
+        """Transactions with bad dates or amounts don't stop date()."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text("""<OFX><CREDITCARDMSGSRSV1><CCSTMTRS><BANKTRANLIST>
+<STMTTRN><DTPOSTED>20250318</DTPOSTED><TRNAMT>-10.00</TRNAMT></STMTTRN>
+<STMTTRN><DTPOSTED>not-a-date</DTPOSTED><TRNAMT>-20.00</TRNAMT></STMTTRN>
+<STMTTRN><DTPOSTED>20250319</DTPOSTED><TRNAMT>1,200.00</TRNAMT></STMTTRN>
+</BANKTRANLIST></CCSTMTRS></CREDITCARDMSGSRSV1></OFX>""")
+
+        result = basic_importer.date(str(qbo_file))
+        assert result == datetime.date(2025, 3, 19)
+
 
 class TestSkipPayments:
     """Tests for skipping settlement payment entries (skip_payments=True)."""
@@ -412,3 +424,13 @@ class TestSkipPayments:
         transactions = [e for e in entries if isinstance(e, data.Transaction)]
 
         assert len(transactions) == 2
+
+    def test_any_of_several_patterns_skips_payment(self, tmp_path):
+        """A description matching any one configured pattern is skipped."""
+        entries = self._extract(
+            tmp_path, skip_payments=True, payment_patterns=("BETALT", "giro")
+        )
+        transactions = [e for e in entries if isinstance(e, data.Transaction)]
+
+        assert len(transactions) == 1
+        assert transactions[0].narration == "TEST MERCHANT"
@@ -13,6 +13,7 @@ renamed exports.
 
 from pathlib import Path
 
+from beancount_no_amex import credit
 from beancount_no_amex.credit import Config, Importer
 
 
@@ -145,6 +146,158 @@ class TestIdentifyWithAccountId:
         assert business_importer.identify(str(file2)) is True
 
 
+    def test_account_id_read_from_file_head(
+        self, importer_with_account_id, minimal_qbo_file, monkeypatch
+    ):
+        """ACCTID in the file head is matched without a full XML parse."""
+        def fail(_filepath):
+            raise AssertionError("find_account_id should not be called")
+
+        monkeypatch.setattr(credit, "find_account_id", fail)
+        assert importer_with_account_id.identify(str(minimal_qbo_file)) is True
+
+    def test_account_id_beyond_head_falls_back_to_parse(
+        self, importer_with_account_id, tmp_path
+    ):
+        """An ACCTID past the sniffed head is still found by parsing."""
+        qbo_file = tmp_path / "activity.qbo"
+        padding = "<!-- " + "x" * 70000 + " -->"
+        qbo_file.write_text(f'''<?xml version="1.0"?>
+<OFX>
+  {padding}
+  <CREDITCARDMSGSRSV1>
+    <CCSTMTRS>
+      <CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM>
+    </CCSTMTRS>
+  </CREDITCARDMSGSRSV1>
+</OFX>''')
+        assert importer_with_account_id.identify(str(qbo_file)) is True
+
+    def test_account_id_beyond_head_uses_parse_cache(
+        self, importer_with_account_id, tmp_path, monkeypatch
+    ):
+        """A file already parsed by this importer is not parsed again."""
+        qbo_file = tmp_path / "activity.qbo"
+        padding = "<!-- " + "x" * 70000 + " -->"
+        qbo_file.write_text(f'''<?xml version="1.0"?>
+<OFX>
+  {padding}
+  <CREDITCARDMSGSRSV1>
+    <CCSTMTRS>
+      <CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM>
+    </CCSTMTRS>
+  </CREDITCARDMSGSRSV1>
+</OFX>''')
+        importer_with_account_id._parse_qbo_file(str(qbo_file))
+
+        def fail(_filepath):
+            raise AssertionError("find_account_id should not be called")
+
+        monkeypatch.setattr(credit, "find_account_id", fail)
+        assert importer_with_account_id.identify(str(qbo_file)) is True
+
+    def test_head_match_stays_inside_its_account_block(self, tmp_path):
+        """An ACCTID from a later CCACCTTO is not taken as the source account."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTRS>
+<CCACCTFROM><ACCTKEY>1</ACCTKEY></CCACCTFROM>
+<BANKTRANLIST><STMTTRN><CCACCTTO><ACCTID>OTHER|1</ACCTID></CCACCTTO></STMTTRN>
+</BANKTRANLIST></CCSTMTRS></CREDITCARDMSGSRSV1></OFX>''')
+        importer = Importer(
+            Config(account_name="Liabilities:CreditCard:Amex", account_id="OTHER|1")
+        )
+        assert importer.identify(str(qbo_file)) is False
+
+    def test_account_id_cut_off_by_max_head_is_not_truncated(
+        self, importer_with_account_id, tmp_path
+    ):
+        """An ACCTID straddling the end of the widest head read still matches."""
+        opening = '<?xml version="1.0"?>\n<OFX><CREDITCARDMSGSRSV1><CCSTMTRS>'
+        block = "<CCACCTFROM><ACCTID>"
+        # Pad so that only "XYZ" of the ACCTID falls inside the head
+        head_bytes = credit.IDENTIFY_MAX_HEAD_BYTES
+        filler = "x" * (head_bytes - 3 - len(opening) - len(block) - len("<!--  -->"))
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text(
+            f"{opening}<!-- {filler} -->{block}XYZ|98765</ACCTID></CCACCTFROM>"
+            "</CCSTMTRS></CREDITCARDMSGSRSV1></OFX>"
+        )
+        assert importer_with_account_id.identify(str(qbo_file)) is True
+
+    def test_escaped_account_id_matches_configured_id(self, tmp_path):
+        """An ACCTID written with entity references matches its decoded form."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTRS>
+<CCACCTFROM><ACCTID>AB&amp;C</ACCTID></CCACCTFROM>
+</CCSTMTRS></CREDITCARDMSGSRSV1></OFX>''')
+        importer = Importer(
+            Config(account_name="Liabilities:CreditCard:Amex", account_id="AB&C")
+        )
+        assert importer.identify(str(qbo_file)) is True
+
+    def test_ccacctfrom_past_small_head_wins_over_bank_in_head(
+        self, importer_with_account_id, tmp_path, monkeypatch
+    ):
+        """A BANKACCTFROM in the first KB does not hide a later CCACCTFROM.
+
+        The widened head reaches the CCACCTFROM, so no full parse is needed.
+        """
+        transactions = "".join(
+            f"<STMTTRN><DTPOSTED>20250320</DTPOSTED><TRNAMT>-1.00</TRNAMT>"
+            f"<FITID>T{i:04d}</FITID></STMTTRN>\n"
+            for i in range(80)
+        )
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text(f'''<?xml version="1.0"?>
+<OFX>
+<BANKMSGSRSV1><STMTRS><BANKACCTFROM><ACCTID>BANK|1</ACCTID></BANKACCTFROM>
+<BANKTRANLIST>{transactions}</BANKTRANLIST></STMTRS></BANKMSGSRSV1>
+<CREDITCARDMSGSRSV1><CCSTMTRS><CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM>
+</CCSTMTRS></CREDITCARDMSGSRSV1>
+</OFX>''')
+        assert qbo_file.stat().st_size > credit.IDENTIFY_HEAD_BYTES
+
+        def fail(_filepath):
+            raise AssertionError("find_account_id should not be called")
+
+        monkeypatch.setattr(credit, "find_account_id", fail)
+        assert importer_with_account_id.identify(str(qbo_file)) is True
+
+    def test_bank_account_id_read_from_complete_head(self, tmp_path, monkeypatch):
+        """A bank-only file that fits in the head is matched without a parse."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><BANKMSGSRSV1><STMTRS>
+<BANKACCTFROM><ACCTID>BANK|1</ACCTID></BANKACCTFROM>
+</STMTRS></BANKMSGSRSV1></OFX>''')
+        importer = Importer(
+            Config(account_name="Liabilities:CreditCard:Amex", account_id="BANK|1")
+        )
+
+        def fail(_filepath):
+            raise AssertionError("find_account_id should not be called")
+
+        monkeypatch.setattr(credit, "find_account_id", fail)
+        assert importer.identify(str(qbo_file)) is True
+
+    def test_markers_beyond_small_head_are_found(self, basic_importer, tmp_path):
+        """OFX markers past the first few KB are found by widening the read."""
+        qbo_file = tmp_path / "activity.qbo"
+        padding = "<!-- " + "x" * 8000 + " -->"
+        qbo_file.write_text(f'''<?xml version="1.0"?>
+{padding}
+<OFX>
+  <CREDITCARDMSGSRSV1>
+    <CCSTMTRS>
+      <CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM>
+    </CCSTMTRS>
+  </CREDITCARDMSGSRSV1>
+</OFX>''')
+        assert basic_importer.identify(str(qbo_file)) is True
+
+
 class TestIdentifyEdgeCases:
     """Edge cases for file identification."""
 
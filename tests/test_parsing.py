@@ -4,17 +4,23 @@ These tests cover the low-level parsing utilities that extract and
 transform data from QBO/OFX files:
 
 - parse_ofx_time(): Parse OFX timestamp formats
+- parse_ofx_amount(): Parse OFX amounts into Decimals
 - find_account_id(): Quick account ID extraction
 - find_currency(): Currency code extraction
+- Importer._parse_qbo_file(): Single-pass statement parsing
 """
 
 import datetime
+import os
+from decimal import Decimal
 
 import pytest
 
+from beancount_no_amex import credit
 from beancount_no_amex.credit import (
     find_account_id,
     find_currency,
+    parse_ofx_amount,
     parse_ofx_time,
 )
 
@@ -77,12 +83,54 @@ class TestParseOfxTime:
         with pytest.raises(ValueError):
             parse_ofx_time("not-a-date")
 
+    def test_invalid_short_date_raises_error(self):
+        """Out-of-range YYYYMMDD values raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_ofx_time("20251320")
+
+    def test_invalid_long_datetime_raises_error(self):
+        """Out-of-range YYYYMMDDHHMMSS values raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_ofx_time("20250320250000")
+
+    def test_repeated_dates_are_cached(self):
+        """Parsing the same string twice returns the cached result."""
+        first = parse_ofx_time("20250321")
+        assert parse_ofx_time("20250321") is first
+
     def test_empty_string_raises_error(self):
         """Empty string raises an error."""
         with pytest.raises((ValueError, IndexError)):
             parse_ofx_time("")
 
 
+# =============================================================================
+# parse_ofx_amount() Tests
+# =============================================================================
+
+
+class TestParseOfxAmount:
+    """Tests for OFX amount parsing (TRNAMT and BALAMT values)."""
+
+    def test_parse_negative_amount(self):
+        """Debits are negative two-decimal amounts."""
+        assert parse_ofx_amount("-742.18") == Decimal("-742.18")
+
+    def test_parse_amount_with_thousands_separator(self):
+        """Commas are treated as thousands separators, like beancount's D()."""
+        assert parse_ofx_amount("1,200.00") == Decimal("1200.00")
+
+    def test_repeated_amounts_are_cached(self):
+        """Parsing the same string twice returns the cached Decimal."""
+        first = parse_ofx_amount("-99.00")
+        assert parse_ofx_amount("-99.00") is first
+
+    def test_invalid_amount_raises_error(self):
+        """Non-numeric strings raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_ofx_amount("twelve")
+
+
 # =============================================================================
 # find_account_id() Tests
 # =============================================================================
@@ -160,6 +208,103 @@ class TestFindAccountId:
         result = find_account_id(str(qbo_file))
         assert result == "BANK|67890"
 
+    def test_ccacctfrom_takes_precedence(self, tmp_path):
+        """CCACCTFROM wins even when a BANKACCTFROM appears first."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX>
+  <BANKMSGSRSV1>
+    <STMTRS>
+      <BANKACCTFROM><ACCTID>BANK|67890</ACCTID></BANKACCTFROM>
+    </STMTRS>
+  </BANKMSGSRSV1>
+  <CREDITCARDMSGSRSV1>
+    <CCSTMTRS>
+      <CCACCTFROM><ACCTID>CC|12345</ACCTID></CCACCTFROM>
+    </CCSTMTRS>
+  </CREDITCARDMSGSRSV1>
+</OFX>''')
+        result = find_account_id(str(qbo_file))
+        assert result == "CC|12345"
+
+    def test_account_id_in_head_skips_xml_parse(self, minimal_qbo_file, monkeypatch):
+        """An ACCTID near the top of the file is read without lxml."""
+        def fail():
+            raise AssertionError("the document should not be parsed")
+
+        monkeypatch.setattr(credit, "_get_recovering_parser", fail)
+        assert find_account_id(str(minimal_qbo_file)) == "XYZ|98765"
+
+    def test_escaped_account_id_matches_parser(self, basic_importer, tmp_path):
+        """Entity references in ACCTID are decoded like the full parser does."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTRS>
+<CCACCTFROM><ACCTID>AB&amp;C</ACCTID></CCACCTFROM>
+</CCSTMTRS></CREDITCARDMSGSRSV1></OFX>''')
+
+        assert find_account_id(str(qbo_file)) == "AB&C"
+        assert basic_importer._parse_qbo_file(str(qbo_file)).account_id == "AB&C"
+
+    def test_account_id_in_comment_is_ignored(self, tmp_path):
+        """A commented-out account block is not mistaken for the real one."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTRS>
+<!-- <CCACCTFROM><ACCTID>OLD|11111</ACCTID></CCACCTFROM> -->
+<CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM>
+</CCSTMTRS></CREDITCARDMSGSRSV1></OFX>''')
+
+        assert find_account_id(str(qbo_file)) == "XYZ|98765"
+
+    def test_ccacctfrom_past_head_wins_over_bank_in_head(
+        self, basic_importer, tmp_path
+    ):
+        """A BANKACCTFROM in the head does not hide a later CCACCTFROM."""
+        transactions = "".join(
+            f"<STMTTRN><DTPOSTED>20250320</DTPOSTED><TRNAMT>-1.00</TRNAMT>"
+            f"<FITID>T{i:04d}</FITID></STMTTRN>\n"
+            for i in range(80)
+        )
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text(f'''<?xml version="1.0"?>
+<OFX>
+<BANKMSGSRSV1><STMTRS><BANKACCTFROM><ACCTID>BANK|1</ACCTID></BANKACCTFROM>
+<BANKTRANLIST>{transactions}</BANKTRANLIST></STMTRS></BANKMSGSRSV1>
+<CREDITCARDMSGSRSV1><CCSTMTRS><CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM>
+</CCSTMTRS></CREDITCARDMSGSRSV1>
+</OFX>''')
+        assert qbo_file.stat().st_size > credit.IDENTIFY_HEAD_BYTES
+
+        assert find_account_id(str(qbo_file)) == "XYZ|98765"
+        assert basic_importer._parse_qbo_file(str(qbo_file)).account_id == "XYZ|98765"
+
+    def test_empty_first_ccacctfrom_matches_parser(self, basic_importer, tmp_path):
+        """An empty first CCACCTFROM yields no ID, as in the full parse."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><CREDITCARDMSGSRSV1>
+<CCSTMTRS><CCACCTFROM><ACCTID></ACCTID></CCACCTFROM></CCSTMTRS>
+<CCSTMTRS><CCACCTFROM><ACCTID>XYZ|98765</ACCTID></CCACCTFROM></CCSTMTRS>
+</CREDITCARDMSGSRSV1></OFX>''')
+
+        assert find_account_id(str(qbo_file)) is None
+        assert basic_importer._parse_qbo_file(str(qbo_file)).account_id is None
+
+    def test_account_id_cut_off_by_head_is_parsed(self, tmp_path):
+        """An ACCTID straddling the end of the scanned head is not truncated."""
+        opening = '<?xml version="1.0"?>\n<OFX><CREDITCARDMSGSRSV1><CCSTMTRS>'
+        block = "<CCACCTFROM><ACCTID>"
+        # Pad so that only "XYZ" of the ACCTID falls inside the head
+        head_bytes = credit.IDENTIFY_HEAD_BYTES
+        filler = "x" * (head_bytes - 3 - len(opening) - len(block) - len("<!--  -->"))
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text(
+            f"{opening}<!-- {filler} -->{block}XYZ|98765</ACCTID></CCACCTFROM>"
+            "</CCSTMTRS></CREDITCARDMSGSRSV1></OFX>"
+        )
+        assert find_account_id(str(qbo_file)) == "XYZ|98765"
+
 
 # =============================================================================
 # find_currency() Tests
@@ -251,3 +396,178 @@ class TestFindCurrency:
         tree = etree.fromstring(qbo_content.encode())
         result = find_currency(tree)
         assert result == "SEK"
+
+    def test_statement_curdef_wins_over_earlier_curdef(self):
+        """CURDEF inside a statement beats one found earlier in the document."""
+        from lxml import etree
+
+        qbo_content = '''<?xml version="1.0"?>
+<OFX>
+  <SIGNONMSGSRSV1><CURDEF>USD</CURDEF></SIGNONMSGSRSV1>
+  <CREDITCARDMSGSRSV1>
+    <CCSTMTRS>
+      <CURDEF>NOK</CURDEF>
+    </CCSTMTRS>
+  </CREDITCARDMSGSRSV1>
+</OFX>'''
+        tree = etree.ElementTree(etree.fromstring(qbo_content.encode()))
+        result = find_currency(tree)
+        assert result == "NOK"
+
+    def test_matches_streaming_parser(self, basic_importer, tmp_path):
+        """find_currency() and _parse_qbo_file() apply the same rule."""
+        from lxml import etree
+
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX>
+  <SIGNONMSGSRSV1><CURDEF>USD</CURDEF></SIGNONMSGSRSV1>
+  <INVSTMTMSGSRSV1>
+    <INVSTMTRS><CURDEF> </CURDEF></INVSTMTRS>
+  </INVSTMTMSGSRSV1>
+  <CREDITCARDMSGSRSV1>
+    <CCSTMTRS><CURDEF>NOK</CURDEF></CCSTMTRS>
+  </CREDITCARDMSGSRSV1>
+</OFX>''')
+        tree = etree.parse(str(qbo_file))
+
+        assert find_currency(tree) == "NOK"
+        assert basic_importer._parse_qbo_file(str(qbo_file)).currency == "NOK"
+
+
+# =============================================================================
+# _parse_qbo_file() Tests
+# =============================================================================
+
+
+class TestParseQboFile:
+    """Tests for the streaming statement parser.
+
+    The parser reads the file in one pass, so metadata that appears after
+    the transaction list (like LEDGERBAL) must still be picked up.
+    """
+
+    def test_parses_minimal_file(self, basic_importer, minimal_qbo_file):
+        """All statement fields are extracted from a minimal file."""
+        result = basic_importer._parse_qbo_file(str(minimal_qbo_file))
+
+        assert result.account_id == "XYZ|98765"
+        assert result.organization == "AMEX"
+        assert result.currency == "NOK"
+        assert result.balance == "-100.00"
+        assert result.balance_date == datetime.date(2025, 3, 20)
+        assert [t.id for t in result.transactions] == ["TEST001"]
+
+    def test_keeps_transaction_order(self, basic_importer, sample_qbo_path):
+        """Transactions are returned in file order."""
+        result = basic_importer._parse_qbo_file(str(sample_qbo_path))
+
+        assert len(result.transactions) == 9
+        assert result.transactions[0].id == "AT3456"
+
+    def test_prefers_statement_currency(self, basic_importer, tmp_path):
+        """A CURDEF inside a statement wins over an earlier stray CURDEF."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX>
+  <SIGNONMSGSRSV1><CURDEF>USD</CURDEF></SIGNONMSGSRSV1>
+  <BANKMSGSRSV1>
+    <STMTRS>
+      <CURDEF>SEK</CURDEF>
+      <BANKACCTFROM><ACCTID>BANK|67890</ACCTID></BANKACCTFROM>
+    </STMTRS>
+  </BANKMSGSRSV1>
+</OFX>''')
+        result = basic_importer._parse_qbo_file(str(qbo_file))
+
+        assert result.currency == "SEK"
+        assert result.account_id == "BANK|67890"
+
+    def test_unclosed_transaction_keeps_its_fields(self, basic_importer, tmp_path):
+        """A STMTTRN missing its close tag is not emptied by the nested one."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text('''<?xml version="1.0"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTRS><BANKTRANLIST>
+<STMTTRN><DTPOSTED>20250319</DTPOSTED><TRNAMT>-10.00</TRNAMT><FITID>A1</FITID>
+<STMTTRN><DTPOSTED>20250320</DTPOSTED><TRNAMT>-20.00</TRNAMT><FITID>A2</FITID></STMTTRN>
+</BANKTRANLIST></CCSTMTRS></CREDITCARDMSGSRSV1></OFX>''')
+        result = basic_importer._parse_qbo_file(str(qbo_file))
+
+        assert [(t.id, t.date, t.amount) for t in result.transactions] == [
+            ("A1", "20250319", "-10.00"),
+            ("A2", "20250320", "-20.00"),
+        ]
+
+    def test_returns_empty_data_for_empty_file(self, basic_importer, tmp_path):
+        """An empty file yields no transactions instead of raising."""
+        qbo_file = tmp_path / "activity.qbo"
+        qbo_file.write_text("")
+        result = basic_importer._parse_qbo_file(str(qbo_file))
+
+        assert result.transactions == []
+        assert result.account_id is None
+
+
+class TestParseCache:
+    """Tests for reuse of the most recent parsed statement.
+
+    Back-to-back calls on an unchanged file should share one parse.
+    """
+
+    def test_date_and_extract_share_one_parse(
+        self, basic_importer, minimal_qbo_file, monkeypatch
+    ):
+        """The second call for an unchanged file is served from the cache."""
+        calls = []
+        read = basic_importer._read_qbo_file
+
+        def counting_read(filepath):
+            calls.append(filepath)
+            return read(filepath)
+
+        monkeypatch.setattr(basic_importer, "_read_qbo_file", counting_read)
+        basic_importer.date(str(minimal_qbo_file))
+        basic_importer.extract(str(minimal_qbo_file), [])
+
+        assert calls == [str(minimal_qbo_file)]
+
+    def test_changed_file_is_parsed_again(
+        self, basic_importer, minimal_qbo_file, minimal_qbo_content
+    ):
+        """Editing the file invalidates the cached result."""
+        first = basic_importer._parse_qbo_file(str(minimal_qbo_file))
+        minimal_qbo_file.write_text(
+            minimal_qbo_content.replace("TEST MERCHANT", "OTHER MERCHANT STORE")
+        )
+        second = basic_importer._parse_qbo_file(str(minimal_qbo_file))
+
+        assert first.transactions[0].payee == "TEST MERCHANT"
+        assert second.transactions[0].payee == "OTHER MERCHANT STORE"
+
+    def test_same_length_rewrite_is_parsed_again(
+        self, basic_importer, minimal_qbo_file, minimal_qbo_content
+    ):
+        """A rewrite that keeps the file size is caught by its new mtime."""
+        first = basic_importer._parse_qbo_file(str(minimal_qbo_file))
+        stat = minimal_qbo_file.stat()
+        minimal_qbo_file.write_text(
+            minimal_qbo_content.replace("TEST MERCHANT", "BEST MERCHANT")
+        )
+        os.utime(minimal_qbo_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        second = basic_importer._parse_qbo_file(str(minimal_qbo_file))
+
+        assert minimal_qbo_file.stat().st_size == stat.st_size
+        assert first.transactions[0].payee == "TEST MERCHANT"
+        assert second.transactions[0].payee == "BEST MERCHANT"
+
+    def test_keeps_only_the_most_recent_parse(
+        self, basic_importer, minimal_qbo_file, minimal_qbo_content, tmp_path
+    ):
+        """Parsing another file replaces the cached statement."""
+        other_file = tmp_path / "other.qbo"
+        other_file.write_text(minimal_qbo_content)
+        basic_importer._parse_qbo_file(str(minimal_qbo_file))
+        other = basic_importer._parse_qbo_file(str(other_file))
+
+        assert basic_importer._cached_qbo_file(str(minimal_qbo_file)) is None
+        assert basic_importer._cached_qbo_file(str(other_file)) is other
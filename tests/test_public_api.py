@@ -1,7 +1,10 @@
 import logging
+import subprocess
+import sys
 
 import pytest
 
+import beancount_no_amex
 from beancount_no_amex import AmexAccountConfig, AmexConfig, Config, Importer
 from beancount_no_amex.importer import Config as ModuleConfig
 from beancount_no_amex.models import QboFileData, RawTransaction
@@ -54,3 +57,44 @@ def test_skipped_rows_warn_without_debug(caplog, monkeypatch):
         assert importer.extract("missing-date.qbo", []) == []
 
     assert "due to missing date" in caplog.text
+
+
+def test_all_public_names_resolve():
+    for name in beancount_no_amex.__all__:
+        assert getattr(beancount_no_amex, name) is not None, name
+
+
+def test_lazy_imports_cover_all_public_names():
+    assert sorted(beancount_no_amex._LAZY_IMPORTS) == sorted(beancount_no_amex.__all__)
+
+
+def test_unknown_attribute_raises_attribute_error():
+    with pytest.raises(AttributeError, match="no attribute 'Nope'"):
+        beancount_no_amex.Nope
+
+
+def test_package_import_defers_importer_module():
+    code = (
+        "import sys, beancount_no_amex; "
+        "print('beancount_no_amex.credit' in sys.modules); "
+        "beancount_no_amex.Importer; "
+        "print('beancount_no_amex.credit' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.split() == ["False", "True"]
+
+
+@pytest.mark.parametrize("submodule", ["credit", "importer", "models"])
+def test_submodules_available_after_bare_import(submodule):
+    code = (
+        "import beancount_no_amex; "
+        f"print(beancount_no_amex.{submodule}.__name__)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == f"beancount_no_amex.{submodule}"